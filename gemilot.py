@@ -1,9 +1,16 @@
 import os
+import re
 import subprocess
+import tempfile
 import time
 import sys
+import json
+import random
+import hashlib
+import asyncio
+import threading
+import concurrent.futures
 from datetime import datetime
-import google.generativeai as genai
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
@@ -11,526 +18,442 @@ from rich.prompt import Prompt
 from rich.markdown import Markdown
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.syntax import Syntax
-import concurrent.futures
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                            QHBoxLayout, QTextEdit, QLineEdit, QPushButton, 
-                            QLabel, QTabWidget, QSplitter, QFrame, QScrollArea)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSize
-from PyQt6.QtGui import QFont, QIcon, QTextCursor, QColor, QPalette, QSyntaxHighlighter, QTextCharFormat
+
+# NumPy and sentence-transformers power the semantic cache; Gemilot still
+# works without them, it just calls Gemini for every phrasing.
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Initialize Rich console
 console = Console()
 
-# Load environment variables
-load_dotenv()
-
-# Configure Gemini API
-genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-
-class BatchSyntaxHighlighter(QSyntaxHighlighter):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.highlighting_rules = []
-
-        # Command format
-        command_format = QTextCharFormat()
-        command_format.setForeground(QColor("#569CD6"))  # Blue
-        self.highlighting_rules.append((
-            r'\b(start|echo|cd|mkdir|rmdir|del|copy|move|ren|type|cls|exit|pause|rem|@echo)\b',
-            command_format
-        ))
-
-        # Path format
-        path_format = QTextCharFormat()
-        path_format.setForeground(QColor("#CE9178"))  # Orange
-        self.highlighting_rules.append((
-            r'[A-Za-z]:\\[\\\S|*\S]?.*',
-            path_format
-        ))
-
-        # Comment format
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("#6A9955"))  # Green
-        self.highlighting_rules.append((
-            r'rem.*$',
-            comment_format
-        ))
-
-    def highlightBlock(self, text):
-        import re
-        for pattern, format in self.highlighting_rules:
-            expression = re.compile(pattern, re.IGNORECASE)
-            for match in expression.finditer(text):
-                self.setFormat(match.start(), match.end() - match.start(), format)
-
-class GeminiWorker(QThread):
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
-    
-    def __init__(self, prompt):
-        super().__init__()
-        self.prompt = prompt
-        self.max_retries = 3
-        self.retry_delay = 2  # seconds
-        
-    def run(self):
-        retries = 0
-        last_error = None
-        
-        while retries < self.max_retries:
-            try:
-                model = genai.GenerativeModel('gemini-2.0-flash')
-                response = model.generate_content(self.prompt)
-                self.finished.emit(response.text)
-                return
-            except Exception as e:
-                last_error = str(e)
-                retries += 1
-                if retries < self.max_retries:
-                    # Wait before retrying
-                    time.sleep(self.retry_delay)
-                else:
-                    # If all retries failed, emit the error
-                    error_message = f"Connection error after {retries} attempts: {last_error}"
-                    self.error.emit(error_message)
-
-class CommandHistoryWidget(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        layout = QVBoxLayout()
-        
-        self.history_list = QTextEdit()
-        self.history_list.setReadOnly(True)
-        self.history_list.setFont(QFont("Consolas", 10))
-        
-        layout.addWidget(QLabel("Command History"))
-        layout.addWidget(self.history_list)
-        
-        self.setLayout(layout)
-        
-    def add_command(self, command):
-        cursor = self.history_list.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        cursor.insertText(f"{command}\n")
-        self.history_list.setTextCursor(cursor)
-        self.history_list.ensureCursorVisible()
-
-class HelpWidget(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        layout = QVBoxLayout()
-        
-        help_text = """
-        <h2>Gemilot Help</h2>
-        
-        <h3>Basic Usage:</h3>
-        <ol>
-            <li>Type your command in the input field</li>
-            <li>Press Enter or click the Send button</li>
-            <li>The command will be executed automatically</li>
-        </ol>
-        
-        <h3>Command Examples:</h3>
-        <ul>
-            <li>"Open Notepad"</li>
-            <li>"Open Chrome and go to google.com"</li>
-            <li>"Create a new folder called test"</li>
-            <li>"Type 'Hello World' in Notepad"</li>
-            <li>"Close Chrome"</li>
-        </ul>
-        
-        <h3>Tips:</h3>
-        <ul>
-            <li>Be specific in your commands</li>
-            <li>Use natural language</li>
-            <li>Check the command preview before execution</li>
-        </ul>
-        """
-        
-        help_label = QLabel(help_text)
-        help_label.setWordWrap(True)
-        help_label.setTextFormat(Qt.TextFormat.RichText)
-        
-        scroll = QScrollArea()
-        scroll.setWidget(help_label)
-        scroll.setWidgetResizable(True)
-        
-        layout.addWidget(scroll)
-        self.setLayout(layout)
+# Directory for Gemilot's persistent data (caches, etc.)
+GEMILOT_DIR = os.path.join(os.path.expanduser("~"), ".gemilot")
 
-class GemilotGUI(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Gemilot")
-        # Set window flags for frameless, always on top, and tool window
-        self.setWindowFlags(
-            Qt.WindowType.Window | 
-            Qt.WindowType.Tool | 
-            Qt.WindowType.FramelessWindowHint |
-            Qt.WindowType.WindowStaysOnTopHint
+# Name of the Gemini model used everywhere
+MODEL_NAME = 'gemini-2.0-flash'
+
+# Instructional preamble shared by every request sent to Gemini
+SYSTEM_INSTRUCTION = (
+    "Convert the following request into Windows batch commands.\n"
+    "Only output the batch commands, nothing else. Each command should be on a new line.\n"
+    "If the request is not possible or unsafe, respond with 'ERROR: [reason]'"
+)
+
+# Full prompt prefix when the preamble is not cached server-side. Kept as one
+# byte-stable constant with the variable request strictly last, so the
+# provider's automatic prefix cache can reuse tokenization and KV state
+# across turns and across the CLI and GUI code paths.
+PROMPT_PREAMBLE = SYSTEM_INSTRUCTION + "\n\nRequest: "
+
+# The google.generativeai import is deferred to first use: it pulls in the
+# whole gRPC/protobuf stack, which CLI turns that never reach Gemini (help,
+# history, local:, cache hits) should not pay for at startup
+_genai = None
+
+def get_genai():
+    """Import and configure google.generativeai on first use."""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        load_dotenv()
+        genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+        _genai = genai
+    return _genai
+
+# Shared GenerativeModel instance; building it once per process keeps client
+# state and the underlying HTTP connection pool alive across requests
+_model = None
+
+def get_model():
+    """Return the shared GenerativeModel, creating it on first use."""
+    global _model
+    if _model is None:
+        _model = get_genai().GenerativeModel(MODEL_NAME)
+    return _model
+
+def build_prompt(user_input):
+    """Build the prompt for a user command.
+
+    Pure string concatenation: Gemini's explicit context cache has a minimum
+    input size far above this ~50-token preamble, so registering it
+    server-side can never succeed; prefix-cache reuse comes from the
+    byte-stable PROMPT_PREAMBLE instead.
+    """
+    return PROMPT_PREAMBLE + user_input
+
+# Transient failure types worth retrying; built lazily because the
+# google.api_core import rides in with the deferred genai stack
+_retryable_errors = None
+
+def is_retryable(error):
+    """Return True for transient failures (anything else — bad request,
+    auth, ... — fails immediately instead of burning the retry budget)."""
+    global _retryable_errors
+    if _retryable_errors is None:
+        from google.api_core import exceptions as gexc
+        _retryable_errors = (
+            gexc.ServiceUnavailable,
+            gexc.ResourceExhausted,
+            gexc.DeadlineExceeded,
+            gexc.InternalServerError,
+            TimeoutError,
         )
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        
-        # Get screen geometry and set window size
-        screen = QApplication.primaryScreen().geometry()
-        self.panel_width = 400
-        self.setGeometry(screen.width() - self.panel_width, 0, self.panel_width, screen.height())
-        
-        # Create main widget
-        main_widget = QWidget()
-        self.setCentralWidget(main_widget)
-        
-        # Create and set the main layout
-        main_layout = QVBoxLayout(main_widget)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-        main_layout.setSpacing(0)
-        
-        # Create the panel container
-        panel_container = QFrame()
-        panel_container.setObjectName("panelContainer")
-        panel_layout = QVBoxLayout(panel_container)
-        panel_layout.setContentsMargins(0, 0, 0, 0)
-        panel_layout.setSpacing(0)
-        
-        # Header with logo and collapse button
-        header = QFrame()
-        header.setObjectName("header")
-        header.setFixedHeight(40)
-        header_layout = QHBoxLayout(header)
-        header_layout.setContentsMargins(10, 0, 10, 0)
-        
-        # Logo and title
-        logo_label = QLabel("🤖")
-        logo_label.setObjectName("logo")
-        title_label = QLabel("Gemilot")
-        title_label.setObjectName("title")
-        
-        # Collapse button
-        self.collapse_button = QPushButton("→")
-        self.collapse_button.setObjectName("collapseButton")
-        self.collapse_button.clicked.connect(self.toggle_collapse)
-        
-        header_layout.addWidget(logo_label)
-        header_layout.addWidget(title_label)
-        header_layout.addStretch()
-        header_layout.addWidget(self.collapse_button)
-        
-        # Chat area
-        chat_area = QFrame()
-        chat_area.setObjectName("chatArea")
-        chat_layout = QVBoxLayout(chat_area)
-        chat_layout.setContentsMargins(10, 10, 10, 10)
-        chat_layout.setSpacing(10)
-        
-        # Create scroll area for chat
-        scroll = QScrollArea()
-        scroll.setObjectName("chatScroll")
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        
-        # Create widget to hold messages
-        self.messages_widget = QWidget()
-        self.messages_widget.setObjectName("messagesWidget")
-        self.messages_layout = QVBoxLayout(self.messages_widget)
-        self.messages_layout.setContentsMargins(5, 5, 5, 5)
-        self.messages_layout.setSpacing(10)
-        self.messages_layout.addStretch()
-        
-        scroll.setWidget(self.messages_widget)
-        chat_layout.addWidget(scroll)
-        
-        # Input area at the bottom
-        input_container = QFrame()
-        input_container.setObjectName("inputContainer")
-        input_layout = QVBoxLayout(input_container)
-        input_layout.setContentsMargins(10, 10, 10, 10)
-        
-        self.command_input = QLineEdit()
-        self.command_input.setPlaceholderText("Ask me anything...")
-        self.command_input.returnPressed.connect(self.process_command)
-        input_layout.addWidget(self.command_input)
-        
-        # Add widgets to panel layout
-        panel_layout.addWidget(header)
-        panel_layout.addWidget(chat_area)
-        panel_layout.addWidget(input_container)
-        
-        # Add panel container to main layout
-        main_layout.addWidget(panel_container)
-        
-        # Initialize state
-        self.is_collapsed = False
-        self.screen_width = screen.width()
-        
-        # Set stylesheet
-        self.setStyleSheet("""
-            QMainWindow {
-                background: transparent;
-            }
-            #panelContainer {
-                background-color: #1E1E1E;
-                border-left: 1px solid #3C3C3C;
-            }
-            #header {
-                background-color: #252526;
-                border-bottom: 1px solid #3C3C3C;
-            }
-            #logo {
-                font-size: 20px;
-            }
-            #title {
-                color: #D4D4D4;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            #collapseButton {
-                background: transparent;
-                color: #D4D4D4;
-                border: none;
-                font-size: 16px;
-                padding: 5px 10px;
-            }
-            #collapseButton:hover {
-                background-color: #3C3C3C;
-                border-radius: 4px;
-            }
-            #chatArea {
-                background-color: #1E1E1E;
-            }
-            #chatScroll {
-                background: transparent;
-                border: none;
-            }
-            #chatScroll QScrollBar:vertical {
-                background: #1E1E1E;
-                width: 8px;
-                margin: 0;
-            }
-            #chatScroll QScrollBar::handle:vertical {
-                background: #3C3C3C;
-                min-height: 20px;
-                border-radius: 4px;
-            }
-            #chatScroll QScrollBar::add-line:vertical,
-            #chatScroll QScrollBar::sub-line:vertical {
-                height: 0;
-            }
-            #messagesWidget {
-                background: transparent;
-            }
-            #inputContainer {
-                background-color: #1E1E1E;
-                border-top: 1px solid #3C3C3C;
-            }
-            QLineEdit {
-                background-color: #252526;
-                color: #D4D4D4;
-                border: 1px solid #3C3C3C;
-                border-radius: 4px;
-                padding: 8px;
-                font-size: 13px;
-            }
-            QLineEdit:focus {
-                border: 1px solid #007ACC;
-            }
-            QLabel[cssClass="userMessage"] {
-                background-color: #007ACC;
-                color: white;
-                padding: 8px 12px;
-                border-radius: 12px;
-                border-bottom-right-radius: 4px;
-                font-size: 13px;
-            }
-            QLabel[cssClass="botMessage"] {
-                background-color: #2D2D2D;
-                color: #D4D4D4;
-                padding: 8px 12px;
-                border-radius: 12px;
-                border-bottom-left-radius: 4px;
-                font-size: 13px;
-            }
-        """)
-    
-    def add_message(self, text, is_user=True):
-        """Add a message bubble to the chat area."""
-        # Create message container
-        container = QWidget()
-        container_layout = QHBoxLayout(container)
-        container_layout.setContentsMargins(0, 0, 0, 0)
-        
-        # Create message label
-        message = QLabel(text)
-        message.setWordWrap(True)
-        message.setProperty("cssClass", "userMessage" if is_user else "botMessage")
-        message.setMinimumWidth(50)
-        message.setMaximumWidth(300)
-        
-        # Add message to the appropriate side
-        if is_user:
-            container_layout.addStretch()
-            container_layout.addWidget(message)
-        else:
-            container_layout.addWidget(message)
-            container_layout.addStretch()
-        
-        # Remove the stretch at the end if it exists
-        while self.messages_layout.count() > 0 and self.messages_layout.itemAt(self.messages_layout.count() - 1).spacerItem():
-            item = self.messages_layout.takeAt(self.messages_layout.count() - 1)
-            if item.spacerItem():
-                del item
-        
-        # Add the new message
-        self.messages_layout.addWidget(container)
-        
-        # Add stretch at the end
-        self.messages_layout.addStretch()
-        
-        # Scroll to bottom
-        QApplication.processEvents()
-        scroll_area = container.parent().parent()
-        if isinstance(scroll_area, QScrollArea):
-            vsb = scroll_area.verticalScrollBar()
-            vsb.setValue(vsb.maximum())
-    
-    def process_command(self):
-        command = self.command_input.text().strip()
-        if not command:
+    return isinstance(error, _retryable_errors)
+
+def _retry_delay(retries):
+    """Exponential backoff with jitter, capped at 30 seconds."""
+    return min(30, (2 ** retries) + random.uniform(0, 1))
+
+async def _generate_async(prompt, on_chunk=None):
+    """Stream a Gemini response, invoking on_chunk for each text chunk."""
+    parts = []
+    stream = await get_model().generate_content_async(prompt, stream=True)
+    async for chunk in stream:
+        if chunk.text:
+            parts.append(chunk.text)
+            if on_chunk is not None:
+                on_chunk(chunk.text)
+    return "".join(parts)
+
+# All Gemini coroutines run on one persistent event loop on its own daemon
+# thread: the SDK caches its grpc.aio channel against the loop of the first
+# call, so a fresh asyncio.run() loop per request would leave every later
+# call bound to an already-closed loop
+_loop = None
+_loop_lock = threading.Lock()
+
+def _get_loop():
+    """Return the shared event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="gemini-loop",
+                             daemon=True).start()
+            _loop = loop
+    return _loop
+
+def generate_with_timeout(prompt, timeout=30, on_chunk=None):
+    """Run one Gemini call with a cooperative timeout, from sync code.
+
+    The response is streamed so callers can show partial output while the
+    rest is still being generated; the deadline covers the whole stream.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        _generate_async(prompt, on_chunk), _get_loop()
+    )
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError("The request took too long to complete. Please try again.")
+
+# Precompiled patterns for requests the CLI can satisfy without Gemini;
+# mirrors the common commands that offer_fallback advertises
+_LOCAL_PATTERNS = [
+    (re.compile(r'^(?:open|launch|start)\s+notepad(?:\.exe)?\s*(?:please)?$', re.IGNORECASE),
+     'start notepad'),
+    (re.compile(r'^(?:open|launch|start)\s+(?:google\s+)?chrome\s*(?:please)?$', re.IGNORECASE),
+     'start chrome'),
+    (re.compile(r'^(?:open|launch|start)\s+calculator\s*(?:please)?$', re.IGNORECASE),
+     'start calc'),
+    (re.compile(r'^(?:create|make)\s+(?:a\s+)?(?:new\s+)?folder(?:\s+(?:called|named))?\s+"?([\w .-]+?)"?$', re.IGNORECASE),
+     'mkdir "{0}"'),
+]
+
+def try_local_match(user_input):
+    """Return a batch script for trivially recognizable commands, or None.
+
+    A handful of precompiled patterns cover the "open notepad" class of
+    requests, so confident matches answer in microseconds instead of paying
+    a Gemini round-trip. Expects input that is already stripped, as the run
+    loops normalize it once per turn.
+    """
+    for pattern, template in _LOCAL_PATTERNS:
+        match = pattern.match(user_input)
+        if match:
+            return template.format(*match.groups())
+    return None
+
+# Pre-encoded header shared by every batch execution
+_BATCH_HEADER = b"@echo off\r\n"
+
+def _run_batch(commands):
+    """Execute batch commands in a single cmd.exe process.
+
+    The script is assembled as bytes (empty lines filtered, whitespace
+    stripped) and run from a real temporary .bat file: Gemini is instructed
+    to emit batch-file syntax, and only an actual batch file gives it
+    batch-file semantics (e.g. %%i FOR variables; cmd.exe's stdin expects
+    interactive %i syntax and prints its startup banner into the output).
+    Returns (stdout, stderr).
+    """
+    body = _BATCH_HEADER + b"\r\n".join(
+        cmd.strip().encode('utf-8') for cmd in commands if cmd.strip()
+    )
+
+    fd, batch_path = tempfile.mkstemp(suffix=".bat")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+
+        process = subprocess.run(
+            ["cmd.exe", "/Q", "/C", batch_path],
+            capture_output=True,
+            timeout=60
+        )
+    finally:
+        try:
+            os.remove(batch_path)
+        except OSError:
+            pass
+
+    return (process.stdout.decode('utf-8', 'replace'),
+            process.stderr.decode('utf-8', 'replace'))
+
+class ResponseCache:
+    """Persistent exact-match cache for Gemini responses.
+
+    Entries are keyed by sha256(model_name + "\\0" + prompt) and stored in
+    ~/.gemilot/llm_cache.json so repeated commands skip the network round-trip
+    entirely. Entries expire after a TTL and the cache is trimmed to the
+    least-recently-used max_entries on insert.
+    """
+
+    def __init__(self, path=None, max_entries=500, ttl=24 * 3600):
+        self.path = path or os.path.join(GEMILOT_DIR, "llm_cache.json")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Write atomically so a crash never leaves a truncated cache file
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # Caching is best-effort; never break the actual request
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.get("expires_at", 0) <= time.time():
+            del self.entries[key]
+            return None
+        # Re-insert so dict order tracks recency for LRU trimming
+        self.entries[key] = self.entries.pop(key)
+        return entry["response"]
+
+    def set(self, key, response):
+        self.entries.pop(key, None)
+        self.entries[key] = {
+            "response": response,
+            "expires_at": time.time() + self.ttl,
+        }
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+        self._save()
+
+def make_cache_key(prompt):
+    """Build the exact-match cache key for a prompt."""
+    return hashlib.sha256(f"{MODEL_NAME}\0{prompt}".encode('utf-8')).hexdigest()
+
+# Shared response cache for both the GUI worker and the CLI
+response_cache = ResponseCache()
+
+class SemanticCache:
+    """Similarity cache mapping natural-language commands to batch scripts.
+
+    Users phrase the same intent many ways ("open notepad", "launch Notepad
+    please"), so an exact-match cache misses most repeats. This cache embeds
+    each command with a small local sentence-transformer model and reuses the
+    stored response of the closest prior prompt when the cosine similarity
+    clears a threshold. One local embedding (~ms) replaces a multi-second
+    Gemini round-trip. Disabled transparently when numpy or
+    sentence-transformers is not installed.
+
+    Persistence is a compacted snapshot (.json + .npz) plus an append-only
+    .ndjson log: each insert appends one line instead of rewriting the whole
+    snapshot, and the log is folded back into the snapshot every
+    COMPACT_EVERY inserts.
+    """
+
+    COMPACT_EVERY = 500
+
+    def __init__(self, path_base=None, threshold=0.92):
+        self.path_base = path_base or os.path.join(GEMILOT_DIR, "llm_semcache")
+        self.threshold = threshold
+        self.prompts = []
+        self.responses = []
+        # (N, 384) float16 matrix, rows normalized; half the bytes per vector
+        # keeps the whole matrix cache-resident as it grows
+        self.embeddings = None
+        self._encoder = None
+        self._encoder_failed = np is None
+        self._log_path = self.path_base + ".ndjson"
+        self._log_entries = 0
+        self._load()
+
+    def _get_encoder(self):
+        if self._encoder is None and not self._encoder_failed:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._encoder = SentenceTransformer('all-MiniLM-L6-v2')
+            except ImportError:
+                self._encoder_failed = True
+        return self._encoder
+
+    def _embed(self, text):
+        encoder = self._get_encoder()
+        if encoder is None:
+            return None
+        return encoder.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    def _load(self):
+        if np is None:
             return
-            
-        # Add user message
-        self.add_message(command, is_user=True)
-        
-        # Clear input
-        self.command_input.clear()
-        
-        # Create prompt for Gemini
-        prompt = f"""Convert the following request into Windows batch commands. 
-        Only output the batch commands, nothing else. Each command should be on a new line.
-        If the request is not possible or unsafe, respond with 'ERROR: [reason]'
-        
-        Request: {command}"""
-        
-        # Start Gemini worker
-        self.worker = GeminiWorker(prompt)
-        self.worker.finished.connect(self.handle_gemini_response)
-        self.worker.error.connect(self.handle_gemini_error)
-        self.worker.start()
-    
-    def handle_gemini_response(self, response):
-        if response.startswith("ERROR:"):
-            self.add_message(response[6:], is_user=False)
+        try:
+            with open(self.path_base + ".json", "r", encoding='utf-8') as f:
+                data = json.load(f)
+            self.prompts = data["prompts"]
+            self.responses = data["responses"]
+            loaded = np.load(self.path_base + ".npz")["embeddings"]
+            # Older snapshots may be float32; normalize the layout either way
+            self.embeddings = np.ascontiguousarray(loaded, dtype=np.float16)
+        except (OSError, ValueError, KeyError):
+            self.prompts = []
+            self.responses = []
+            self.embeddings = None
+        self._replay_log()
+
+    def _replay_log(self):
+        """Apply entries appended since the snapshot was last compacted."""
+        rows = []
+        dim = self.embeddings.shape[1] if self.embeddings is not None else None
+        try:
+            with open(self._log_path, "r", encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        prompt = entry["prompt"]
+                        response = entry["response"]
+                        row = np.asarray(entry["emb"], dtype=np.float16)
+                    except (ValueError, TypeError, KeyError):
+                        continue  # torn tail write from a crash; skip it
+                    if row.ndim != 1 or (dim is not None and row.shape[0] != dim):
+                        continue  # wrong vector shape; treat like a torn line
+                    if dim is None:
+                        dim = row.shape[0]
+                    # Only a fully validated entry touches the three
+                    # structures, so lists and matrix can't desynchronize
+                    self.prompts.append(prompt)
+                    self.responses.append(response)
+                    rows.append(row)
+                    self._log_entries += 1
+        except OSError:
             return
-            
-        # Clean up the response
-        cleaned_response = self.clean_gemini_response(response)
-        
-        # Add bot message showing the commands
-        self.add_message("Executing commands:\n" + cleaned_response, is_user=False)
-        
+        if rows:
+            stacked = [self.embeddings] if self.embeddings is not None else []
+            self.embeddings = np.ascontiguousarray(np.vstack(stacked + rows))
+
+    def _save(self):
         try:
-            # Execute commands
-            self.execute_commands(cleaned_response.split('\n'))
-            self.add_message("Commands executed successfully!", is_user=False)
-        except Exception as e:
-            self.add_message(f"Error executing commands: {str(e)}", is_user=False)
-    
-    def handle_gemini_error(self, error_message):
-        self.add_message(f"Error: {error_message}", is_user=False)
-    
-    def clean_gemini_response(self, response):
-        """Clean up Gemini response by removing Markdown code block syntax."""
-        lines = response.strip().split('\n')
-        
-        if len(lines) >= 2:
-            if lines[0].startswith('```'):
-                lines = lines[1:]
-            if lines[-1].strip() == '```':
-                lines = lines[:-1]
-        
-        return '\n'.join(lines)
-    
-    def execute_commands(self, commands):
+            os.makedirs(GEMILOT_DIR, exist_ok=True)
+            tmp_path = self.path_base + ".json.tmp"
+            with open(tmp_path, "w", encoding='utf-8') as f:
+                json.dump({"prompts": self.prompts, "responses": self.responses}, f)
+            os.replace(tmp_path, self.path_base + ".json")
+            np.savez_compressed(self.path_base + ".npz", embeddings=self.embeddings)
+            return True
+        except OSError:
+            return False  # Caching is best-effort; never break the request
+
+    def _append_log(self, text, response, embedding):
+        """Record one insert with an O(1) append instead of a full rewrite."""
         try:
-            # Filter out empty lines and strip whitespace
-            commands = [cmd.strip() for cmd in commands if cmd.strip()]
-            
-            # Create batch content with proper encoding
-            batch_content = "@echo off\r\n"
-            batch_content += "\r\n".join(commands)
-            
-            # Write file with UTF-8 encoding
-            with open("temp_commands.bat", "w", encoding='utf-8', newline='\r\n') as f:
-                f.write(batch_content)
-            
-            # Execute batch file
-            process = subprocess.Popen(
-                ["cmd.exe", "/c", "temp_commands.bat"],
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding='utf-8'
-            )
-            
-            stdout, stderr = process.communicate()
-            
-            # Clean up
-            if os.path.exists("temp_commands.bat"):
-                os.remove("temp_commands.bat")
-                
-            if stderr:
-                raise Exception(stderr)
-                
-        except Exception as e:
-            if os.path.exists("temp_commands.bat"):
-                os.remove("temp_commands.bat")
-            raise Exception(str(e))
-    
-    def toggle_collapse(self):
-        if self.is_collapsed:
-            # Expand - slide in from right
-            self.setGeometry(self.screen_width - self.panel_width, 0, self.panel_width, self.height())
-            self.collapse_button.setText("→")
+            os.makedirs(GEMILOT_DIR, exist_ok=True)
+            entry = {
+                "prompt": text,
+                "response": response,
+                "emb": embedding.astype(np.float32).tolist(),
+            }
+            with open(self._log_path, "a", encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            return
+        self._log_entries += 1
+        if self._log_entries >= self.COMPACT_EVERY:
+            self._compact()
+
+    def _compact(self):
+        """Fold the append log into the snapshot and truncate it."""
+        if self._save():
+            try:
+                os.remove(self._log_path)
+            except OSError:
+                pass
+            self._log_entries = 0
+
+    def lookup(self, text):
+        """Return the cached response for the most similar prior prompt, or None."""
+        if self.embeddings is None or len(self.prompts) == 0:
+            return None
+        query = self._embed(text)
+        if query is None:
+            return None
+        # One vectorized inner product over the whole matrix; einsum lets
+        # BLAS pick the kernel and handles the float16/float32 mix
+        sims = np.einsum('ij,j->i', self.embeddings, query)
+        best = int(sims.argmax())
+        if sims[best] >= self.threshold:
+            return self.responses[best]
+        return None
+
+    def add(self, text, response):
+        """Store a prompt/response pair after a successful Gemini call."""
+        embedding = self._embed(text)
+        if embedding is None:
+            return
+        self.prompts.append(text)
+        self.responses.append(response)
+        row = embedding.astype(np.float16).reshape(1, -1)
+        if self.embeddings is None:
+            self.embeddings = row
         else:
-            # Collapse - slide out to right
-            self.setGeometry(self.screen_width - 40, 0, self.panel_width, self.height())
-            self.collapse_button.setText("←")
-        
-        self.is_collapsed = not self.is_collapsed
-    
-    # Override mouse events to prevent dragging
-    def mousePressEvent(self, event):
-        event.accept()
+            self.embeddings = np.ascontiguousarray(np.vstack([self.embeddings, row]))
+        self._append_log(text, response, embedding)
 
-    def mouseMoveEvent(self, event):
-        event.accept()
+# Shared semantic cache for near-duplicate commands
+semantic_cache = SemanticCache()
 
 class GemilotCLI:
     def __init__(self):
         self.console = Console()
         self.command_history = []
         self.start_time = datetime.now()
+        # Single-lookup dispatch for the fixed special commands
+        self.special_commands = {
+            'help': self.show_help,
+            'history': self.show_history,
+        }
 
-    def create_batch_file(self, commands):
-        """Create a temporary batch file with the given commands."""
-        try:
-            # Filter out empty lines and strip whitespace
-            commands = [cmd.strip() for cmd in commands if cmd.strip()]
-            
-            # Create batch content with proper encoding
-            batch_content = "@echo off\r\n"
-            batch_content += "\r\n".join(commands)
-            
-            # Write file with UTF-8 encoding
-            with open("temp_commands.bat", "w", encoding='utf-8', newline='\r\n') as f:
-                f.write(batch_content)
-                
-        except Exception as e:
-            raise Exception(f"Error creating batch file: {str(e)}")
-
-    def execute_batch_file(self):
-        """Execute the temporary batch file."""
+    def execute_batch(self, commands):
+        """Execute the given batch commands."""
         try:
             with Progress(
                 SpinnerColumn(),
@@ -538,62 +461,51 @@ class GemilotCLI:
                 transient=True,
             ) as progress:
                 progress.add_task(description="Executing commands...", total=None)
-                
-                # Use explicit cmd.exe call with proper encoding
-                process = subprocess.Popen(
-                    ["cmd.exe", "/c", "temp_commands.bat"],
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8'
-                )
-                
-                stdout, stderr = process.communicate()
-                
-                # Clean up
-                if os.path.exists("temp_commands.bat"):
-                    os.remove("temp_commands.bat")
-                    
+
+                stdout, stderr = _run_batch(commands)
+
                 if stderr:
                     raise Exception(stderr)
-                    
+
                 return stdout
-                
+
         except Exception as e:
-            if os.path.exists("temp_commands.bat"):
-                os.remove("temp_commands.bat")
-            raise Exception(f"Error executing batch file: {str(e)}")
+            raise Exception(f"Error executing batch commands: {str(e)}")
 
     def get_gemini_response(self, prompt):
         """Get response from Gemini model with timeout and retry logic."""
         max_retries = 3
-        retry_delay = 2  # seconds
-        
+
+        # Serve repeated prompts straight from the cache
+        cache_key = make_cache_key(prompt)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         for retry in range(max_retries):
             try:
-                model = genai.GenerativeModel('gemini-2.0-flash')
-                
-                # Create a function to generate content
-                def generate():
-                    response = model.generate_content(prompt)
-                    return response.text
-
-                # Use ThreadPoolExecutor with timeout
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(generate)
-                    try:
-                        response = future.result(timeout=30)  # 30 second timeout
-                        return response
-                    except concurrent.futures.TimeoutError:
-                        raise TimeoutError("The request took too long to complete. Please try again.")
-                    except Exception as e:
-                        raise Exception(f"Error getting response from Gemini: {str(e)}")
-                        
+                # Stream the response so the user sees output as it arrives.
+                # Only the first attempt streams: a retry would reprint the
+                # whole response after the partial first-attempt output.
+                on_chunk = None
+                if retry == 0:
+                    # Plain text: model output must not be parsed as rich
+                    # markup (an unmatched [/x] would raise MarkupError)
+                    on_chunk = lambda text: console.print(
+                        text, end="", markup=False, highlight=False)
+                response = generate_with_timeout(prompt, on_chunk=on_chunk)
+                if retry == 0:
+                    console.print()
+                response_cache.set(cache_key, response)
+                return response
             except Exception as e:
+                if not is_retryable(e):
+                    # Permanent failure; retrying would only add latency
+                    raise
                 if retry < max_retries - 1:
-                    console.print(f"[yellow]Connection error, retrying in {retry_delay} seconds... (Attempt {retry+1}/{max_retries})[/yellow]")
-                    time.sleep(retry_delay)
+                    delay = _retry_delay(retry + 1)
+                    console.print(f"[yellow]Connection error, retrying in {delay:.1f} seconds... (Attempt {retry+1}/{max_retries})[/yellow]")
+                    time.sleep(delay)
                 else:
                     raise Exception(f"Failed to get response after {max_retries} attempts: {str(e)}")
 
@@ -665,17 +577,20 @@ class GemilotCLI:
         while True:
             try:
                 user_input = Prompt.ask("\n[bold blue]You[/bold blue]").strip()
-                
-                if user_input.lower() == 'exit':
+                if not user_input:
+                    continue
+                lowered = user_input.lower()
+
+                if lowered == 'exit':
                     console.print("[bold green]Goodbye! 👋[/bold green]")
                     break
-                elif user_input.lower() == 'help':
-                    self.show_help()
-                    continue
-                elif user_input.lower() == 'history':
-                    self.show_history()
+
+                handler = self.special_commands.get(lowered)
+                if handler is not None:
+                    handler()
                     continue
-                elif user_input.lower().startswith('local:'):
+
+                if lowered.startswith('local:'):
                     # Handle local commands
                     local_command = user_input[6:].strip()
                     self.execute_local_command(local_command)
@@ -683,23 +598,33 @@ class GemilotCLI:
                 
                 # Add command to history
                 self.command_history.append(user_input)
-                
-                # Create a prompt that instructs Gemini to generate batch commands
-                prompt = f"""Convert the following request into Windows batch commands. 
-                Only output the batch commands, nothing else. Each command should be on a new line.
-                If the request is not possible or unsafe, respond with 'ERROR: [reason]'
-                
-                Request: {user_input}"""
-                
+
+                # Requests matching a known local pattern skip Gemini entirely
+                local_batch = try_local_match(user_input)
+                if local_batch is not None:
+                    commands = local_batch.split('\n')
+                    self.show_command_preview(commands)
+                    self.execute_batch(commands)
+                    console.print("[bold green]Commands executed successfully![/bold green]")
+                    continue
+
                 try:
-                    with console.status("[bold green]Thinking...[/bold green]"):
-                        response = self.get_gemini_response(prompt)
-                    
+                    # Reuse the response of a near-identical earlier command
+                    response = semantic_cache.lookup(user_input)
+                    from_cache = response is not None
+                    if not from_cache:
+                        prompt = build_prompt(user_input)
+                        with console.status("[bold green]Thinking...[/bold green]"):
+                            response = self.get_gemini_response(prompt)
+
                     if response.startswith("ERROR:"):
                         console.print(f"[bold red]Error:[/bold red] {response[6:]}")
                         self.offer_fallback()
                         continue
-                    
+
+                    if not from_cache:
+                        semantic_cache.add(user_input, response)
+
                     # Clean up the response
                     cleaned_response = self.clean_gemini_response(response)
                     
@@ -707,9 +632,8 @@ class GemilotCLI:
                     commands = cleaned_response.split('\n')
                     self.show_command_preview(commands)
                     
-                    # Create and execute batch file
-                    self.create_batch_file(commands)
-                    self.execute_batch_file()
+                    # Execute the batch commands
+                    self.execute_batch(commands)
                     console.print("[bold green]Commands executed successfully![/bold green]")
                 
                 except TimeoutError as e:
@@ -725,46 +649,23 @@ class GemilotCLI:
     def execute_local_command(self, command):
         """Execute a command locally without using Gemini."""
         try:
-            # Create batch file with proper encoding
-            batch_content = "@echo off\r\n"
-            batch_content += command.strip()
-            
-            with open("temp_commands.bat", "w", encoding='utf-8', newline='\r\n') as f:
-                f.write(batch_content)
-                
-            # Execute batch file
-            self.output_area.append(f"<span style='color: #4EC9B0;'>Executing local command: {command}</span>")
-            
-            process = subprocess.Popen(
-                ["cmd.exe", "/c", "temp_commands.bat"],
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding='utf-8'
-            )
-            
-            stdout, stderr = process.communicate()
-            
-            # Clean up
-            if os.path.exists("temp_commands.bat"):
-                os.remove("temp_commands.bat")
-                
+            console.print(f"[cyan]Executing local command:[/cyan] {command}")
+
+            stdout, stderr = _run_batch([command])
+
             # Show output
             if stdout:
-                self.output_area.append("<span style='color: #DCDCAA;'>Output:</span>")
-                self.output_area.append(stdout)
-                
+                console.print("[yellow]Output:[/yellow]")
+                console.print(stdout)
+
             if stderr:
-                self.output_area.append("<span style='color: #F14C4C;'>Errors:</span>")
-                self.output_area.append(stderr)
-                
-            self.output_area.append("<span style='color: #4EC9B0;'>Command executed successfully!</span>")
-            self.statusBar().showMessage("Ready")
-            
+                console.print("[bold red]Errors:[/bold red]")
+                console.print(stderr)
+            else:
+                console.print("[bold green]Command executed successfully![/bold green]")
+
         except Exception as e:
-            self.output_area.append(f"<span style='color: #F14C4C;'>Error executing command: {str(e)}</span>")
-            self.statusBar().showMessage("Error occurred")
+            console.print(f"[bold red]Error executing command:[/bold red] {str(e)}")
     
     def offer_fallback(self):
         """Offer fallback options for common commands when Gemini API fails."""
@@ -781,6 +682,10 @@ class GemilotCLI:
 def main():
     # Check if GUI mode is requested
     if len(sys.argv) > 1 and sys.argv[1] == "--gui":
+        # Import Qt only when the GUI is actually requested
+        from PyQt6.QtWidgets import QApplication
+        from gemilot_gui import GemilotGUI
+
         app = QApplication(sys.argv)
         window = GemilotGUI()
         window.show()
@@ -0,0 +1,520 @@
+"""Qt front-end for Gemilot.
+
+Imported lazily from gemilot.main() so plain CLI invocations never pay
+the PyQt6 import cost.
+"""
+
+import re
+import time
+
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
+                            QHBoxLayout, QTextEdit, QLineEdit, QPushButton,
+                            QLabel, QTabWidget, QSplitter, QFrame, QScrollArea,
+                            QListView)
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSize, QTimer, QStringListModel
+from PyQt6.QtGui import QFont, QIcon, QTextCursor, QColor, QPalette, QSyntaxHighlighter, QTextCharFormat
+
+from gemilot import (_retry_delay, _run_batch, build_prompt, generate_with_timeout,
+                     is_retryable, make_cache_key, response_cache, semantic_cache)
+
+class BatchSyntaxHighlighter(QSyntaxHighlighter):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.highlighting_rules = []
+
+        # Command format
+        command_format = QTextCharFormat()
+        command_format.setForeground(QColor("#569CD6"))  # Blue
+        self.highlighting_rules.append((
+            re.compile(r'\b(start|echo|cd|mkdir|rmdir|del|copy|move|ren|type|cls|exit|pause|rem|@echo)\b', re.IGNORECASE),
+            command_format
+        ))
+
+        # Path format
+        path_format = QTextCharFormat()
+        path_format.setForeground(QColor("#CE9178"))  # Orange
+        self.highlighting_rules.append((
+            re.compile(r'[A-Za-z]:\\[\\\S|*\S]?.*', re.IGNORECASE),
+            path_format
+        ))
+
+        # Comment format
+        comment_format = QTextCharFormat()
+        comment_format.setForeground(QColor("#6A9955"))  # Green
+        self.highlighting_rules.append((
+            re.compile(r'rem.*$', re.IGNORECASE),
+            comment_format
+        ))
+
+    def highlightBlock(self, text):
+        for pattern, format in self.highlighting_rules:
+            for match in pattern.finditer(text):
+                self.setFormat(match.start(), match.end() - match.start(), format)
+
+class GeminiWorker(QThread):
+    chunk = pyqtSignal(str)
+    retrying = pyqtSignal()
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, prompt, command=""):
+        super().__init__()
+        self.prompt = prompt
+        self.command = command
+        self.max_retries = 3
+
+    def run(self):
+        retries = 0
+        last_error = None
+
+        # Reuse the response of a near-identical earlier command. Looking up
+        # here keeps the embedding work — and the encoder's expensive first
+        # construction — off the UI thread.
+        if self.command:
+            cached = semantic_cache.lookup(self.command)
+            if cached is not None:
+                self.finished.emit(cached)
+                return
+
+        # Serve repeated prompts straight from the cache
+        cache_key = make_cache_key(self.prompt)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            self.finished.emit(cached)
+            return
+
+        while retries < self.max_retries:
+            try:
+                response_text = generate_with_timeout(self.prompt, on_chunk=self.chunk.emit)
+                response_cache.set(cache_key, response_text)
+                # Remember the command for future near-duplicate phrasings
+                if self.command and not response_text.startswith("ERROR:"):
+                    semantic_cache.add(self.command, response_text)
+                self.finished.emit(response_text)
+                return
+            except Exception as e:
+                if not is_retryable(e):
+                    # Permanent failure; retrying would only add latency
+                    self.error.emit(str(e))
+                    return
+                last_error = str(e)
+                retries += 1
+                if retries < self.max_retries:
+                    # Let the GUI drop any partial stream before the next
+                    # attempt re-streams the response from the start
+                    self.retrying.emit()
+                    time.sleep(_retry_delay(retries))
+                else:
+                    # If all retries failed, emit the error
+                    error_message = f"Connection error after {retries} attempts: {last_error}"
+                    self.error.emit(error_message)
+
+class CommandHistoryWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout()
+        
+        self.history_model = QStringListModel()
+        self.history_list = QListView()
+        self.history_list.setModel(self.history_model)
+        self.history_list.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.history_list.setFont(QFont("Consolas", 10))
+
+        layout.addWidget(QLabel("Command History"))
+        layout.addWidget(self.history_list)
+
+        self.setLayout(layout)
+
+    def add_command(self, command):
+        row = self.history_model.rowCount()
+        self.history_model.insertRow(row)
+        self.history_model.setData(self.history_model.index(row), command)
+        self.history_list.scrollToBottom()
+
+class HelpWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout()
+        
+        help_text = """
+        <h2>Gemilot Help</h2>
+        
+        <h3>Basic Usage:</h3>
+        <ol>
+            <li>Type your command in the input field</li>
+            <li>Press Enter or click the Send button</li>
+            <li>The command will be executed automatically</li>
+        </ol>
+        
+        <h3>Command Examples:</h3>
+        <ul>
+            <li>"Open Notepad"</li>
+            <li>"Open Chrome and go to google.com"</li>
+            <li>"Create a new folder called test"</li>
+            <li>"Type 'Hello World' in Notepad"</li>
+            <li>"Close Chrome"</li>
+        </ul>
+        
+        <h3>Tips:</h3>
+        <ul>
+            <li>Be specific in your commands</li>
+            <li>Use natural language</li>
+            <li>Check the command preview before execution</li>
+        </ul>
+        """
+        
+        help_label = QLabel(help_text)
+        help_label.setWordWrap(True)
+        help_label.setTextFormat(Qt.TextFormat.RichText)
+        
+        scroll = QScrollArea()
+        scroll.setWidget(help_label)
+        scroll.setWidgetResizable(True)
+        
+        layout.addWidget(scroll)
+        self.setLayout(layout)
+
+class GemilotGUI(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Gemilot")
+        # Set window flags for frameless, always on top, and tool window
+        self.setWindowFlags(
+            Qt.WindowType.Window | 
+            Qt.WindowType.Tool | 
+            Qt.WindowType.FramelessWindowHint |
+            Qt.WindowType.WindowStaysOnTopHint
+        )
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        
+        # Get screen geometry and set window size
+        screen = QApplication.primaryScreen().geometry()
+        self.panel_width = 400
+        self.setGeometry(screen.width() - self.panel_width, 0, self.panel_width, screen.height())
+        
+        # Create main widget
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        
+        # Create and set the main layout
+        main_layout = QVBoxLayout(main_widget)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+        main_layout.setSpacing(0)
+        
+        # Create the panel container
+        panel_container = QFrame()
+        panel_container.setObjectName("panelContainer")
+        panel_layout = QVBoxLayout(panel_container)
+        panel_layout.setContentsMargins(0, 0, 0, 0)
+        panel_layout.setSpacing(0)
+        
+        # Header with logo and collapse button
+        header = QFrame()
+        header.setObjectName("header")
+        header.setFixedHeight(40)
+        header_layout = QHBoxLayout(header)
+        header_layout.setContentsMargins(10, 0, 10, 0)
+        
+        # Logo and title
+        logo_label = QLabel("🤖")
+        logo_label.setObjectName("logo")
+        title_label = QLabel("Gemilot")
+        title_label.setObjectName("title")
+        
+        # Collapse button
+        self.collapse_button = QPushButton("→")
+        self.collapse_button.setObjectName("collapseButton")
+        self.collapse_button.clicked.connect(self.toggle_collapse)
+        
+        header_layout.addWidget(logo_label)
+        header_layout.addWidget(title_label)
+        header_layout.addStretch()
+        header_layout.addWidget(self.collapse_button)
+        
+        # Chat area
+        chat_area = QFrame()
+        chat_area.setObjectName("chatArea")
+        chat_layout = QVBoxLayout(chat_area)
+        chat_layout.setContentsMargins(10, 10, 10, 10)
+        chat_layout.setSpacing(10)
+        
+        # Create scroll area for chat
+        scroll = QScrollArea()
+        scroll.setObjectName("chatScroll")
+        scroll.setWidgetResizable(True)
+        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        
+        # Create widget to hold messages
+        self.messages_widget = QWidget()
+        self.messages_widget.setObjectName("messagesWidget")
+        self.messages_layout = QVBoxLayout(self.messages_widget)
+        self.messages_layout.setContentsMargins(5, 5, 5, 5)
+        self.messages_layout.setSpacing(10)
+        self.messages_layout.addStretch()
+        
+        scroll.setWidget(self.messages_widget)
+        chat_layout.addWidget(scroll)
+        self._scroll = scroll
+        
+        # Input area at the bottom
+        input_container = QFrame()
+        input_container.setObjectName("inputContainer")
+        input_layout = QVBoxLayout(input_container)
+        input_layout.setContentsMargins(10, 10, 10, 10)
+        
+        self.command_input = QLineEdit()
+        self.command_input.setPlaceholderText("Ask me anything...")
+        self.command_input.returnPressed.connect(self.process_command)
+        input_layout.addWidget(self.command_input)
+        
+        # Add widgets to panel layout
+        panel_layout.addWidget(header)
+        panel_layout.addWidget(chat_area)
+        panel_layout.addWidget(input_container)
+        
+        # Add panel container to main layout
+        main_layout.addWidget(panel_container)
+        
+        # Initialize state
+        self.is_collapsed = False
+        self.screen_width = screen.width()
+        # In-flight workers (kept referenced until they finish) and the live
+        # streaming bubble belonging to each
+        self._workers = set()
+        self._stream_labels = {}
+        
+        # Set stylesheet
+        self.setStyleSheet("""
+            QMainWindow {
+                background: transparent;
+            }
+            #panelContainer {
+                background-color: #1E1E1E;
+                border-left: 1px solid #3C3C3C;
+            }
+            #header {
+                background-color: #252526;
+                border-bottom: 1px solid #3C3C3C;
+            }
+            #logo {
+                font-size: 20px;
+            }
+            #title {
+                color: #D4D4D4;
+                font-size: 14px;
+                font-weight: bold;
+            }
+            #collapseButton {
+                background: transparent;
+                color: #D4D4D4;
+                border: none;
+                font-size: 16px;
+                padding: 5px 10px;
+            }
+            #collapseButton:hover {
+                background-color: #3C3C3C;
+                border-radius: 4px;
+            }
+            #chatArea {
+                background-color: #1E1E1E;
+            }
+            #chatScroll {
+                background: transparent;
+                border: none;
+            }
+            #chatScroll QScrollBar:vertical {
+                background: #1E1E1E;
+                width: 8px;
+                margin: 0;
+            }
+            #chatScroll QScrollBar::handle:vertical {
+                background: #3C3C3C;
+                min-height: 20px;
+                border-radius: 4px;
+            }
+            #chatScroll QScrollBar::add-line:vertical,
+            #chatScroll QScrollBar::sub-line:vertical {
+                height: 0;
+            }
+            #messagesWidget {
+                background: transparent;
+            }
+            #inputContainer {
+                background-color: #1E1E1E;
+                border-top: 1px solid #3C3C3C;
+            }
+            QLineEdit {
+                background-color: #252526;
+                color: #D4D4D4;
+                border: 1px solid #3C3C3C;
+                border-radius: 4px;
+                padding: 8px;
+                font-size: 13px;
+            }
+            QLineEdit:focus {
+                border: 1px solid #007ACC;
+            }
+            QLabel[cssClass="userMessage"] {
+                background-color: #007ACC;
+                color: white;
+                padding: 8px 12px;
+                border-radius: 12px;
+                border-bottom-right-radius: 4px;
+                font-size: 13px;
+            }
+            QLabel[cssClass="botMessage"] {
+                background-color: #2D2D2D;
+                color: #D4D4D4;
+                padding: 8px 12px;
+                border-radius: 12px;
+                border-bottom-left-radius: 4px;
+                font-size: 13px;
+            }
+        """)
+    
+    def add_message(self, text, is_user=True):
+        """Add a message bubble to the chat area."""
+        # Create message container
+        container = QWidget()
+        container_layout = QHBoxLayout(container)
+        container_layout.setContentsMargins(0, 0, 0, 0)
+        
+        # Create message label
+        message = QLabel(text)
+        message.setWordWrap(True)
+        message.setProperty("cssClass", "userMessage" if is_user else "botMessage")
+        message.setMinimumWidth(50)
+        message.setMaximumWidth(300)
+        
+        # Add message to the appropriate side
+        if is_user:
+            container_layout.addStretch()
+            container_layout.addWidget(message)
+        else:
+            container_layout.addWidget(message)
+            container_layout.addStretch()
+        
+        # Insert before the permanent trailing stretch added in __init__
+        self.messages_layout.insertWidget(self.messages_layout.count() - 1, container)
+
+        # Scroll to bottom on the next event-loop iteration, once the new
+        # bubble has been laid out
+        QTimer.singleShot(0, self._scroll_to_bottom)
+
+        return message
+
+    def _scroll_to_bottom(self):
+        vsb = self._scroll.verticalScrollBar()
+        vsb.setValue(vsb.maximum())
+
+    def process_command(self):
+        command = self.command_input.text().strip()
+        if not command:
+            return
+            
+        # Add user message
+        self.add_message(command, is_user=True)
+        
+        # Clear input
+        self.command_input.clear()
+
+        # Create prompt for Gemini
+        prompt = build_prompt(command)
+
+        # Start Gemini worker; all cache lookups and network work happen on
+        # its thread, and per-request state lives on the worker so overlapping
+        # requests can't swap each other's commands or stream bubbles
+        worker = GeminiWorker(prompt, command=command)
+        worker.chunk.connect(self.handle_gemini_chunk)
+        worker.retrying.connect(self.handle_gemini_retry)
+        worker.finished.connect(self.handle_gemini_response)
+        worker.error.connect(self.handle_gemini_error)
+        self._workers.add(worker)
+        worker.start()
+
+    def handle_gemini_chunk(self, text):
+        """Append streamed response text to the sending worker's bot bubble."""
+        worker = self.sender()
+        label = self._stream_labels.get(worker)
+        if label is None:
+            self._stream_labels[worker] = self.add_message(text, is_user=False)
+        else:
+            label.setText(label.text() + text)
+            QTimer.singleShot(0, self._scroll_to_bottom)
+
+    def handle_gemini_retry(self):
+        """Reset the sender's stream bubble before a retry re-streams it."""
+        label = self._stream_labels.get(self.sender())
+        if label is not None:
+            label.setText("")
+
+    def handle_gemini_response(self, response):
+        worker = self.sender()
+        self._workers.discard(worker)
+        streamed = self._stream_labels.pop(worker, None) is not None
+
+        if response.startswith("ERROR:"):
+            # The streamed bubble already shows the error text
+            if not streamed:
+                self.add_message(response[6:], is_user=False)
+            return
+
+        # Clean up the response
+        cleaned_response = self.clean_gemini_response(response)
+
+        # Add bot message showing the commands unless they streamed in live
+        if not streamed:
+            self.add_message("Executing commands:\n" + cleaned_response, is_user=False)
+
+        try:
+            # Execute commands
+            self.execute_commands(cleaned_response.split('\n'))
+            self.add_message("Commands executed successfully!", is_user=False)
+        except Exception as e:
+            self.add_message(f"Error executing commands: {str(e)}", is_user=False)
+
+    def handle_gemini_error(self, error_message):
+        worker = self.sender()
+        self._workers.discard(worker)
+        self._stream_labels.pop(worker, None)
+        self.add_message(f"Error: {error_message}", is_user=False)
+    
+    def clean_gemini_response(self, response):
+        """Clean up Gemini response by removing Markdown code block syntax."""
+        lines = response.strip().split('\n')
+        
+        if len(lines) >= 2:
+            if lines[0].startswith('```'):
+                lines = lines[1:]
+            if lines[-1].strip() == '```':
+                lines = lines[:-1]
+        
+        return '\n'.join(lines)
+    
+    def execute_commands(self, commands):
+        try:
+            stdout, stderr = _run_batch(commands)
+            if stderr:
+                raise Exception(stderr)
+        except Exception as e:
+            raise Exception(str(e))
+    
+    def toggle_collapse(self):
+        if self.is_collapsed:
+            # Expand - slide in from right
+            self.setGeometry(self.screen_width - self.panel_width, 0, self.panel_width, self.height())
+            self.collapse_button.setText("→")
+        else:
+            # Collapse - slide out to right
+            self.setGeometry(self.screen_width - 40, 0, self.panel_width, self.height())
+            self.collapse_button.setText("←")
+        
+        self.is_collapsed = not self.is_collapsed
+    
+    # Override mouse events to prevent dragging
+    def mousePressEvent(self, event):
+        event.accept()
+
+    def mouseMoveEvent(self, event):
+        event.accept()